@@ -0,0 +1,74 @@
+"""
+Gunicorn Configuration
+======================
+Workers share one database pool per process across many threads (gthread)
+or greenlets (gevent), keeping the number of PostgreSQL connections at
+roughly workers x DB_POOL_MAX_CONN instead of one pool per request slot.
+
+Settings can be overridden with GUNICORN_* environment variables.
+"""
+
+import math
+import os
+
+# Server socket
+bind = f"0.0.0.0:{os.getenv('APPLICATION_PORT', '5001')}"
+
+# Set SO_REUSEPORT on the listening socket so a new master can bind the
+# port while the old one drains (zero-downtime restarts / side-by-side runs)
+reuse_port = True
+
+def available_cpus() -> int:
+    """CPUs this container may use; cpu_count() reports every host CPU"""
+    try:
+        # Honours taskset/cpuset restrictions
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    # cgroup v2 CPU quota, e.g. `docker run --cpus` or an ECS task CPU limit
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+
+    return cpus
+
+# Worker processes, one per available CPU by default; concurrency comes from threads
+workers = int(os.getenv('GUNICORN_WORKERS', available_cpus()))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+
+# gthread: threads per worker. The insert batcher and the health probe each
+# check out a connection as well, so keep threads <= DB_POOL_MAX_CONN - 2 or
+# requests will queue for DB_POOL_ACQUIRE_TIMEOUT waiting on the pool
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+
+# gevent: concurrent greenlets per worker. Only DB_POOL_MAX_CONN of them hold
+# a connection at a time; the rest wait up to DB_POOL_ACQUIRE_TIMEOUT
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+worker_tmp_dir = '/dev/shm'
+timeout = 120
+keepalive = 5
+max_requests = 1000
+max_requests_jitter = 100
+
+# The database pool and background threads must be created inside each
+# worker, so the application is never loaded in the master process
+preload_app = False
+
+# Logging
+accesslog = '-'
+errorlog = '-'
+loglevel = 'info'
+capture_output = True
+
+def post_fork(server, worker):
+    """Make psycopg2 cooperative before the worker imports the application"""
+    if worker.cfg.worker_class_str == 'gevent':
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+        server.log.info(f"Worker {worker.pid}: patched psycopg2 for gevent")
@@ -12,19 +12,40 @@ Demo application for AWS infrastructure with:
 
 import os
 import sys
+import copy
 import json
+import atexit
 import socket
 import signal
 import logging
-from datetime import datetime
-from typing import Dict, Any, Optional
-
+import logging.handlers
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+
+import orjson
 import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
 from psycopg2 import pool
-from flask import Flask, jsonify, request, Response
+from psycopg2.extras import execute_values
+from flask import Flask, jsonify, request, Response, stream_with_context
+from flask.json.provider import JSONProvider
 from werkzeug.exceptions import HTTPException
 import boto3
 from botocore.exceptions import ClientError
+from aws_secretsmanager_caching import SecretCache, SecretCacheConfig
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, Info,
+    disable_created_metrics, generate_latest
+)
+from prometheus_client.core import GaugeMetricFamily
 
 # =============================================================================
 # Configuration
@@ -52,9 +73,25 @@ class Config:
     DB_USER = os.getenv('DB_USER', 'postgres')
     DB_PASSWORD = os.getenv('DB_PASSWORD', '')
 
+    # Secrets Manager settings (overrides DB_* when set)
+    DB_SECRET_ARN = os.getenv('DB_SECRET_ARN', '')
+    # Refreshing more often than every 5 minutes only adds API load
+    DB_SECRET_REFRESH_INTERVAL = max(300, int(os.getenv('DB_SECRET_REFRESH_INTERVAL', 3600)))
+
     # Connection pool settings
     DB_POOL_MIN_CONN = int(os.getenv('DB_POOL_MIN_CONN', 2))
     DB_POOL_MAX_CONN = int(os.getenv('DB_POOL_MAX_CONN', 10))
+    # Seconds a checkout waits for a free connection before failing
+    DB_POOL_ACQUIRE_TIMEOUT = float(os.getenv('DB_POOL_ACQUIRE_TIMEOUT', 5))
+
+    # Insert batching settings
+    INSERT_BATCH_MAX_SIZE = int(os.getenv('INSERT_BATCH_MAX_SIZE', 100))
+    INSERT_BATCH_MAX_WAIT_MS = int(os.getenv('INSERT_BATCH_MAX_WAIT_MS', 5))
+    BULK_INSERT_MAX_ITEMS = int(os.getenv('BULK_INSERT_MAX_ITEMS', 1000))
+
+    # Background database health check settings (seconds)
+    HEALTH_CHECK_INTERVAL = float(os.getenv('HEALTH_CHECK_INTERVAL', 2))
+    HEALTH_CHECK_STALE_AFTER = float(os.getenv('HEALTH_CHECK_STALE_AFTER', 10))
 
     # Instance metadata
     INSTANCE_ID = os.getenv('INSTANCE_ID', socket.gethostname())
@@ -65,12 +102,21 @@ class Config:
 # Logging Configuration
 # =============================================================================
 
+def utc_isoformat(timestamp: Optional[float] = None) -> str:
+    """Format a POSIX timestamp (default: now) as ISO-8601 UTC with a 'Z' suffix"""
+    if timestamp is None:
+        timestamp = time.time()
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='microseconds').replace('+00:00', 'Z')
+
 class JsonFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging"""
 
     def format(self, record: logging.LogRecord) -> str:
+        # The dict literal's constant keys are built by a single opcode and
+        # orjson encodes it faster than a str.format_map template would
         log_data = {
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            # Reuse the time captured when the record was created
+            'timestamp': utc_isoformat(record.created),
             'level': record.levelname,
             'logger': record.name,
             'message': record.getMessage(),
@@ -79,23 +125,54 @@ class JsonFormatter(logging.Formatter):
             'line': record.lineno,
         }
 
-        # Add exception info if present
+        # Add exception info if present (pre-rendered by LogQueueHandler)
         if record.exc_info:
             log_data['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_data['exception'] = record.exc_text
 
         # Add extra fields
         if hasattr(record, 'request_id'):
             log_data['request_id'] = record.request_id
 
-        return json.dumps(log_data)
+        return orjson.dumps(log_data).decode()
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that keeps the exception separate from the message
+
+    The stock QueueHandler folds the traceback into the message text, which
+    would drop the 'exception' field from the JSON output.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+log_listener: Optional[logging.handlers.QueueListener] = None
 
 def setup_logging():
-    """Configure structured JSON logging"""
+    """Configure structured JSON logging
+
+    Request threads only enqueue records; formatting and writing to stdout
+    happen on the listener's background thread.
+    """
+    global log_listener
+
     handler = logging.StreamHandler(sys.stdout)
     handler.setFormatter(JsonFormatter())
 
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    log_listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    log_listener.start()
+    atexit.register(stop_logging)
+
     logger = logging.getLogger()
-    logger.addHandler(handler)
+    logger.addHandler(LogQueueHandler(log_queue))
     logger.setLevel(logging.INFO if not Config.DEBUG else logging.DEBUG)
 
     # Suppress noisy loggers
@@ -103,18 +180,226 @@ def setup_logging():
 
     return logging.getLogger(__name__)
 
+def stop_logging():
+    """Flush queued log records and stop the listener thread"""
+    global log_listener
+
+    if log_listener:
+        log_listener.stop()
+        log_listener = None
+
 logger = setup_logging()
 
+# =============================================================================
+# Metrics
+# =============================================================================
+
+# Expose only the *_total series, not the *_created timestamps
+disable_created_metrics()
+
+APP_INFO = Info('application', 'Application information')
+APP_INFO.info({
+    'version': Config.APP_VERSION,
+    'environment': Config.ENVIRONMENT,
+    'instance': Config.INSTANCE_ID,
+})
+
+APP_UP = Gauge('application_up', 'Application is running')
+APP_UP.set(1)
+
+REQUESTS = Counter('http_requests_total', 'Total HTTP requests')
+ERRORS = Counter('http_errors_total', 'Total HTTP errors')
+
+DB_POOL_CHECKOUTS = Counter('db_pool_checkout_total', 'Connection checkout attempts')
+DB_POOL_CHECKOUT_FAILURES = Counter(
+    'db_pool_checkout_failed_total',
+    'Checkouts that failed to open or hand out a connection'
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    'db_pool_checkout_timeout_total',
+    'Checkouts that gave up waiting for a free connection'
+)
+DB_POOL_ACQUIRE_SECONDS = Histogram(
+    'db_pool_acquire_seconds',
+    'Time spent checking out a connection',
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+)
+
+# =============================================================================
+# Secrets Manager Credential Refresher
+# =============================================================================
+
+class CredentialRefresher:
+    """Re-reads the database secret from Secrets Manager in the background
+
+    The secret is re-read every refresh interval, or right away after
+    request_refresh() (called on a login failure). Forced refreshes sleep for
+    a few seconds of jitter inside SecretCache, so they only ever run on this
+    thread; request threads fail fast and never wait for them.
+
+    A value only counts as applied once every listener accepted it. If one
+    raises (e.g. the database is unreachable during a failover), the same
+    value is offered again after retry_interval seconds.
+    """
+
+    def __init__(self, secret_arn: str, refresh_interval: int, retry_interval: float = 30):
+        self.secret_arn = secret_arn
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._secret_cache: Optional[SecretCache] = None
+        # Last value every listener applied successfully
+        self._secret_string: Optional[str] = None
+        self._apply_failed = False
+        self._listeners: List[Callable[[str], None]] = []
+        self._refresh_requested = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, callback: Callable[[str], None]):
+        """Call callback(secret_string) whenever the secret value changes
+
+        The callback raises if it could not apply the value, which makes the
+        refresher retry it.
+        """
+        self._listeners.append(callback)
+
+    def _get_secret_cache(self) -> SecretCache:
+        """Create the Secrets Manager caching client on first use"""
+        with self._lock:
+            if self._secret_cache is None:
+                self._secret_cache = SecretCache(
+                    config=SecretCacheConfig(secret_refresh_interval=self.refresh_interval),
+                    client=boto3.client('secretsmanager', region_name=Config.AWS_REGION)
+                )
+            return self._secret_cache
+
+    def get(self) -> str:
+        """Return the secret string from the cache (blocks on the first call only)"""
+        return self._get_secret_cache().get_secret_string(self.secret_arn)
+
+    def request_refresh(self):
+        """Ask the background thread to re-read the secret now"""
+        self._refresh_requested.set()
+
+    def start(self):
+        """Start the background refresh thread"""
+        if not self.secret_arn or (self._thread and self._thread.is_alive()):
+            return
+        self._thread = threading.Thread(target=self._run, name='secret-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refresh thread"""
+        self._stop_event.set()
+        self._refresh_requested.set()
+
+    def _run(self):
+        """Re-read the secret every interval, or when a refresh is requested"""
+        while not self._stop_event.is_set():
+            interval = self.retry_interval if self._apply_failed else self.refresh_interval
+            forced = self._refresh_requested.wait(interval)
+            if self._stop_event.is_set():
+                break
+            self._refresh_requested.clear()
+            self.refresh(force=forced)
+
+    def refresh(self, force: bool = False):
+        """Fetch the secret and notify listeners until they have applied it"""
+        try:
+            if force:
+                self._get_secret_cache().refresh_secret_now(self.secret_arn)
+            secret_string = self.get()
+        except Exception as e:
+            logger.warning(f"Secret refresh failed, keeping current credentials: {e}")
+            return
+
+        if secret_string == self._secret_string:
+            return
+        logger.info("Applying database credentials from Secrets Manager")
+        try:
+            for callback in self._listeners:
+                callback(secret_string)
+        except Exception as e:
+            self._apply_failed = True
+            logger.error(f"Failed to apply refreshed credentials, retrying in {self.retry_interval}s: {e}")
+            return
+
+        self._secret_string = secret_string
+        self._apply_failed = False
+
+credential_refresher = CredentialRefresher(Config.DB_SECRET_ARN, Config.DB_SECRET_REFRESH_INTERVAL)
+
 # =============================================================================
 # Database Connection Pool
 # =============================================================================
 
-class DatabasePool:
-    """PostgreSQL connection pool manager"""
+@dataclass(frozen=True, slots=True)
+class DbCreds:
+    """Database connection parameters"""
+
+    host: str
+    port: int
+    database: str
+    user: str
+    password: str = field(repr=False)
+
+    @classmethod
+    def from_secret(cls, secret_string: str) -> 'DbCreds':
+        """Parse an RDS-style Secrets Manager JSON payload"""
+        secret = json.loads(secret_string)
+        return cls(
+            host=secret.get('host'),
+            port=int(secret.get('port', 5432)),
+            database=secret.get('dbname'),
+            user=secret.get('username'),
+            password=secret.get('password')
+        )
+
+    @classmethod
+    def from_config(cls) -> 'DbCreds':
+        """Build credentials from the DB_* environment variables"""
+        return cls(
+            host=Config.DB_HOST,
+            port=Config.DB_PORT,
+            database=Config.DB_NAME,
+            user=Config.DB_USER,
+            password=Config.DB_PASSWORD
+        )
+
+class PreparedStatementConnection(psycopg2.extensions.connection):
+    """Connection that tracks which of the pool's statements are prepared on it"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared: set = set()
+
+class PoolTimeoutError(pool.PoolError):
+    """No connection became free within DB_POOL_ACQUIRE_TIMEOUT"""
 
-    def __init__(self):
-        self.pool: Optional[pool.SimpleConnectionPool] = None
+class DatabasePool:
+    """PostgreSQL connection pool manager
+
+    Uses a thread-safe pool so that every gunicorn worker thread can hold its
+    own connection while waiting on the database, instead of serializing
+    requests behind a single blocking query. psycopg2 raises as soon as all
+    connections are checked out, so checkouts first wait (up to
+    DB_POOL_ACQUIRE_TIMEOUT) on a semaphore sized to the pool.
+    """
+
+    def __init__(self, prepared_statements: Optional[Dict[str, str]] = None):
+        self.pool: Optional[pool.ThreadedConnectionPool] = None
+        self.prepared_statements = prepared_statements or {}
         self._initialized = False
+        self._cached_creds: Optional[DbCreds] = None
+        # Gevent workers monkey-patch threading before the app is imported,
+        # so waiting greenlets yield instead of blocking the worker
+        self._slots = threading.Semaphore(Config.DB_POOL_MAX_CONN)
+        self._waiting = 0
+        self._waiting_lock = threading.Lock()
+
+        # Rebuild the pool in the background when the secret is rotated
+        credential_refresher.subscribe(self._on_secret_rotated)
 
     def initialize(self):
         """Initialize database connection pool"""
@@ -122,65 +407,90 @@ class DatabasePool:
             return
 
         try:
-            # Try to get credentials from Secrets Manager
-            db_config = self._get_db_credentials_from_secrets_manager()
-
-            # Fallback to environment variables
-            if not db_config:
-                db_config = {
-                    'host': Config.DB_HOST,
-                    'port': Config.DB_PORT,
-                    'database': Config.DB_NAME,
-                    'user': Config.DB_USER,
-                    'password': Config.DB_PASSWORD
-                }
-
-            logger.info(f"Initializing database pool: {db_config['host']}:{db_config['port']}/{db_config['database']}")
-
-            self.pool = pool.SimpleConnectionPool(
-                Config.DB_POOL_MIN_CONN,
-                Config.DB_POOL_MAX_CONN,
-                **db_config,
-                connect_timeout=10
-            )
-
-            # Test connection and create table
-            self._create_tables()
-            self._initialized = True
-
+            self._open(self._load_db_credentials())
             logger.info("Database pool initialized successfully")
 
         except Exception as e:
+            # Credentials may have been rotated since they were loaded; the
+            # refresher retries _open() with the current secret
+            if isinstance(e, psycopg2.OperationalError) and self._is_login_failure(e):
+                credential_refresher.request_refresh()
             logger.error(f"Failed to initialize database pool: {e}")
+
+    def _open(self, creds: DbCreds):
+        """Create the pool and tables, keeping creds only if both succeed"""
+        self.pool = self._create_pool(creds)
+        try:
+            # Test connection and create table
+            self._create_tables()
+        except Exception:
+            self.pool.closeall()
             self.pool = None
+            raise
+        self._cached_creds = creds
+        self._initialized = True
+
+    def _create_pool(self, creds: DbCreds) -> pool.ThreadedConnectionPool:
+        """Create a connection pool from the given database credentials"""
+        logger.info(f"Initializing database pool: {creds.host}:{creds.port}/{creds.database}")
+
+        return pool.ThreadedConnectionPool(
+            Config.DB_POOL_MIN_CONN,
+            Config.DB_POOL_MAX_CONN,
+            host=creds.host,
+            port=creds.port,
+            dbname=creds.database,
+            user=creds.user,
+            password=creds.password,
+            connect_timeout=10,
+            connection_factory=PreparedStatementConnection
+        )
+
+    @staticmethod
+    def _is_login_failure(error: Exception) -> bool:
+        """Check whether a connection error is caused by stale credentials"""
+        return bool(Config.DB_SECRET_ARN) and 'authentication failed' in str(error)
+
+    def _load_db_credentials(self) -> DbCreds:
+        """Load credentials from Secrets Manager, falling back to environment variables"""
+        return self._get_db_credentials_from_secrets_manager() or DbCreds.from_config()
+
+    def _on_secret_rotated(self, secret_string: str):
+        """Swap in a pool built from rotated credentials (refresher thread)
+
+        Raises if the pool cannot be built, so the refresher retries; the
+        current pool and credentials stay in place until then.
+        """
+        creds = DbCreds.from_secret(secret_string)
+
+        if not self._initialized:
+            self._open(creds)
+            logger.info("Database pool initialized with refreshed credentials")
+            return
+
+        if creds == self._cached_creds:
+            return
 
-    def _get_db_credentials_from_secrets_manager(self) -> Optional[Dict[str, Any]]:
+        # Connections still checked out from the stale pool are closed by
+        # return_connection(); its idle ones close when it is collected
+        logger.warning("Rebuilding database pool with rotated credentials")
+        self.pool = self._create_pool(creds)
+        self._cached_creds = creds
+
+    def _get_db_credentials_from_secrets_manager(self) -> Optional[DbCreds]:
         """Retrieve database credentials from AWS Secrets Manager"""
-        secret_arn = os.getenv('DB_SECRET_ARN', '')
+        secret_arn = Config.DB_SECRET_ARN
 
         if not secret_arn:
             logger.info("No DB_SECRET_ARN provided, using environment variables")
             return None
 
         try:
-            session = boto3.session.Session()
-            client = session.client(
-                service_name='secretsmanager',
-                region_name=Config.AWS_REGION
-            )
-
-            response = client.get_secret_value(SecretId=secret_arn)
-            secret = json.loads(response['SecretString'])
+            creds = DbCreds.from_secret(credential_refresher.get())
 
             logger.info("Successfully retrieved database credentials from Secrets Manager")
 
-            return {
-                'host': secret.get('host'),
-                'port': int(secret.get('port', 5432)),
-                'database': secret.get('dbname'),
-                'user': secret.get('username'),
-                'password': secret.get('password')
-            }
+            return creds
 
         except ClientError as e:
             logger.error(f"Failed to retrieve secret from Secrets Manager: {e}")
@@ -188,53 +498,135 @@ class DatabasePool:
 
     def _create_tables(self):
         """Create application tables if they don't exist"""
-        conn = None
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-
-            # Create items table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS items (
-                    id SERIAL PRIMARY KEY,
-                    name VARCHAR(255) NOT NULL,
-                    description TEXT,
-                    value VARCHAR(255),
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-            # Create index
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_items_created_at
-                ON items(created_at DESC)
-            """)
-
-            conn.commit()
-            cursor.close()
+            with self.connection() as conn, conn.cursor() as cursor:
+                # Create items table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS items (
+                        id SERIAL PRIMARY KEY,
+                        name VARCHAR(255) NOT NULL,
+                        description TEXT,
+                        value VARCHAR(255),
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+
+                # Create index
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_items_created_at
+                    ON items(created_at DESC)
+                """)
+
+                conn.commit()
 
             logger.info("Database tables created/verified successfully")
 
         except Exception as e:
             logger.error(f"Failed to create tables: {e}")
-            if conn:
+            raise
+
+    @contextmanager
+    def connection(self, record_metrics: bool = True) -> Iterator[Any]:
+        """Check out a connection and always return it to the pool
+
+        If the block raises, the open transaction is rolled back first so an
+        aborted transaction is never handed to the next borrower.
+        """
+        conn = self.get_connection(record_metrics)
+        try:
+            yield conn
+        except Exception:
+            if not conn.closed:
                 conn.rollback()
             raise
         finally:
-            if conn:
-                self.return_connection(conn)
+            self.return_connection(conn)
+
+    def get_connection(self, record_metrics: bool = True):
+        """Get a connection from the pool
 
-    def get_connection(self):
-        """Get a connection from the pool"""
+        Internal probes pass record_metrics=False so the checkout metrics
+        only describe application traffic.
+        """
         if not self.pool:
             raise Exception("Database pool not initialized")
-        return self.pool.getconn()
+        if not record_metrics:
+            return self._checkout()
+
+        start = time.monotonic()
+        try:
+            return self._checkout()
+        except PoolTimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.inc()
+            raise
+        except Exception:
+            DB_POOL_CHECKOUT_FAILURES.inc()
+            raise
+        finally:
+            DB_POOL_ACQUIRE_SECONDS.observe(time.monotonic() - start)
+            DB_POOL_CHECKOUTS.inc()
+
+    def _checkout(self):
+        """Wait for a free slot and check out a connection"""
+        if not self._slots.acquire(blocking=False):
+            with self._waiting_lock:
+                self._waiting += 1
+            try:
+                acquired = self._slots.acquire(timeout=Config.DB_POOL_ACQUIRE_TIMEOUT)
+            finally:
+                with self._waiting_lock:
+                    self._waiting -= 1
+            if not acquired:
+                raise PoolTimeoutError("connection pool exhausted")
+
+        try:
+            return self.pool.getconn()
+        except Exception as e:
+            self._slots.release()
+            # Fail this request now; the refresher rebuilds the pool if the
+            # secret was rotated
+            if isinstance(e, psycopg2.OperationalError) and self._is_login_failure(e):
+                credential_refresher.request_refresh()
+            raise
+
+    def execute_prepared(self, cursor, name: str, params: Tuple[Any, ...]):
+        """EXECUTE a hot query, preparing it on first use by this connection
+
+        PostgreSQL then skips parse/plan for every later call on the same
+        connection. PREPARE is not undone by a rollback, so a statement is
+        recorded as soon as it succeeds.
+        """
+        conn = cursor.connection
+        if name not in conn.prepared:
+            cursor.execute(f'PREPARE {name} AS {self.prepared_statements[name]}')
+            conn.prepared.add(name)
+        placeholders = ', '.join(['%s'] * len(params))
+        cursor.execute(f'EXECUTE {name} ({placeholders})', params)
 
     def return_connection(self, conn):
         """Return a connection to the pool"""
-        if self.pool:
-            self.pool.putconn(conn)
+        try:
+            if self.pool:
+                try:
+                    self.pool.putconn(conn)
+                except pool.PoolError:
+                    # Connection belongs to a pool replaced after a secret rotation
+                    conn.close()
+        finally:
+            self._slots.release()
+
+    def usage(self) -> Optional[Dict[str, int]]:
+        """Sample pooled connections checked out and idle, and checkouts waiting"""
+        current_pool = self.pool
+        if not current_pool:
+            return None
+        with current_pool._lock:
+            return {
+                'checked_out': len(current_pool._used),
+                'idle': len(current_pool._pool),
+                'waiting': self._waiting,
+            }
 
     def close_all(self):
         """Close all connections in the pool"""
@@ -242,7 +634,268 @@ class DatabasePool:
             self.pool.closeall()
             logger.info("Database pool closed")
 
-db_pool = DatabasePool()
+# Hot item queries, prepared on each pooled connection when first used
+PREPARED_STATEMENTS = {
+    'items_list': """
+        SELECT id, name, description, value, created_at, updated_at
+        FROM items
+        ORDER BY created_at DESC
+        LIMIT $1 OFFSET $2
+    """,
+    'items_insert': """
+        INSERT INTO items (name, description, value)
+        VALUES ($1, $2, $3)
+        RETURNING id, name, description, value, created_at
+    """,
+}
+
+db_pool = DatabasePool(PREPARED_STATEMENTS)
+
+class DBPoolCollector:
+    """Samples connection pool usage at scrape time"""
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        usage = db_pool.usage()
+        if not usage:
+            return
+        yield GaugeMetricFamily('db_pool_size', 'Database connection pool size',
+                                value=Config.DB_POOL_MAX_CONN)
+        yield GaugeMetricFamily('db_pool_checked_out', 'Connections currently checked out of the pool',
+                                value=usage['checked_out'])
+        yield GaugeMetricFamily('db_pool_idle', 'Idle connections held by the pool',
+                                value=usage['idle'])
+        yield GaugeMetricFamily('db_pool_waiting', 'Checkouts waiting for a free connection',
+                                value=usage['waiting'])
+
+REGISTRY.register(DBPoolCollector())
+
+# =============================================================================
+# Item Inserts
+# =============================================================================
+
+ITEM_INSERT_SQL = """
+    INSERT INTO items (name, description, value)
+    VALUES %s
+    RETURNING id, name, description, value, created_at
+"""
+
+def insert_items(rows: List[Tuple[Any, Any, Any]]) -> List[Dict[str, Any]]:
+    """Insert (name, description, value) rows in a single transaction"""
+    with db_pool.connection() as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+            if len(rows) == 1:
+                db_pool.execute_prepared(cursor, 'items_insert', rows[0])
+                created = cursor.fetchall()
+            else:
+                created = execute_values(
+                    cursor,
+                    ITEM_INSERT_SQL,
+                    rows,
+                    template='(%s, %s, %s)',
+                    page_size=500,
+                    fetch=True
+                )
+        conn.commit()
+        return created
+
+class InsertBatcher:
+    """Coalesces concurrent single-item inserts into multi-row INSERTs
+
+    Request threads enqueue a row and wait on a future; a background thread
+    collects rows for up to max_wait_ms (or max_batch_size rows) and writes
+    them with one statement.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_ms: int):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0, max_wait_ms) / 1000
+        self._queue: queue.Queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, row: Tuple[Any, Any, Any], timeout: float = 30) -> Dict[str, Any]:
+        """Queue a row for insertion and wait for the created item"""
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((row, future))
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            # A row still in the queue is dropped so a client retry cannot
+            # duplicate it; one already being written is waited for instead
+            if not future.cancel():
+                return future.result()
+            raise TimeoutError(f"Item was not written within {timeout}s") from None
+
+    def stop(self):
+        """Stop the background writer thread"""
+        self._stop_event.set()
+
+    def _ensure_started(self):
+        """Start the writer thread lazily (after any gunicorn fork)"""
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='insert-batcher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Drain the queue in batches until stopped"""
+        while not self._stop_event.is_set():
+            try:
+                batch = [self._queue.get(timeout=1)]
+            except queue.Empty:
+                continue
+
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._flush(batch)
+
+    def _flush(self, batch: List[Tuple[Tuple[Any, Any, Any], Future]]):
+        """Insert a batch, skipping rows whose request stopped waiting"""
+        batch = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch: List[Tuple[Tuple[Any, Any, Any], Future]]):
+        """Insert a batch and resolve the waiting futures"""
+        try:
+            created = insert_items([row for row, _ in batch])
+        except (psycopg2.DataError, psycopg2.IntegrityError) as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # Retry rows one by one so a single bad row only fails its own request
+            logger.warning(f"Batched insert of {len(batch)} items failed, retrying individually: {e}")
+            for entry in batch:
+                self._write([entry])
+            return
+        except Exception as e:
+            # Pool and connection errors would fail every row again, one
+            # acquire timeout at a time, so the whole batch fails at once
+            logger.error(f"Batched insert of {len(batch)} items failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), item in zip(batch, created):
+            future.set_result(item)
+
+        # Never leave a request waiting for a row the INSERT did not return
+        if len(created) != len(batch):
+            logger.error(f"Batched insert returned {len(created)} rows for {len(batch)} items")
+            for _, future in batch[len(created):]:
+                future.set_exception(RuntimeError("Insert did not return the created item"))
+
+insert_batcher = InsertBatcher(Config.INSERT_BATCH_MAX_SIZE, Config.INSERT_BATCH_MAX_WAIT_MS)
+
+# =============================================================================
+# Database Health Monitor
+# =============================================================================
+
+class DBHealthMonitor:
+    """Probes the database in the background so /health never touches the pool
+
+    The latest result is kept as a (status, checked_at) tuple, which is
+    replaced atomically and can be read without locking.
+    """
+
+    def __init__(self, interval: float, stale_after: float):
+        self.interval = interval
+        self.stale_after = stale_after
+        self.state: Tuple[str, float] = ('unknown', 0.0)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background probe thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name='db-health', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background probe thread"""
+        self._stop_event.set()
+
+    def status(self) -> str:
+        """Return the last probe result, or 'stale' if the probe stopped reporting"""
+        status, checked_at = self.state
+        if checked_at and time.monotonic() - checked_at > self.stale_after:
+            return 'stale'
+        return status
+
+    def _run(self):
+        """Probe the database every interval until stopped"""
+        while not self._stop_event.is_set():
+            self.check()
+            self._stop_event.wait(self.interval)
+
+    def check(self):
+        """Run SELECT 1 against the pool and record the outcome"""
+        if not db_pool.pool:
+            self.state = ('not_initialized', time.monotonic())
+            return
+
+        status = 'ok'
+        try:
+            with db_pool.connection(record_metrics=False) as conn, conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+        except pool.PoolError:
+            # The database may be fine; every connection is just busy
+            status = 'pool_exhausted'
+        except Exception as e:
+            status = f'error: {str(e)}'
+
+        # Only log transitions, not every probe
+        if status != self.state[0] and status != 'ok':
+            logger.warning(f"Health check database status: {status}")
+        self.state = (status, time.monotonic())
+
+db_health = DBHealthMonitor(Config.HEALTH_CHECK_INTERVAL, Config.HEALTH_CHECK_STALE_AFTER)
+
+# =============================================================================
+# JSON Serialization
+# =============================================================================
+
+def _json_default(obj: Any) -> Any:
+    """Serialize types orjson does not handle natively"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def json_dumps(obj: Any) -> bytes:
+    """Serialize an object to JSON bytes"""
+    return orjson.dumps(obj, default=_json_default)
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return json_dumps(obj).decode()
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # Skip the bytes -> str -> bytes round trip of the base implementation
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(json_dumps(obj), mimetype='application/json')
 
 # =============================================================================
 # Flask Application
@@ -250,10 +903,10 @@ db_pool = DatabasePool()
 
 app = Flask(__name__)
 app.config.from_object(Config)
+app.json = OrjsonProvider(app)
 
-# Metrics tracking
-request_count = 0
-error_count = 0
+# Rows fetched per round trip when streaming query results
+STREAM_ITERSIZE = 500
 
 # =============================================================================
 # Application Initialization
@@ -268,6 +921,20 @@ def _initialize_database():
     except Exception as e:
         logger.warning(f"Database initialization failed (application will continue): {e}")
 
+    db_health.start()
+    credential_refresher.start()
+
+# app.run() is the single-process Werkzeug development server and is not
+# used in production. Refuse to run this file directly outside development,
+# before any connection or background thread is created
+if __name__ == '__main__' and Config.FLASK_ENV != 'development':
+    logger.error(
+        "The Flask development server only runs with FLASK_ENV=development; "
+        "use 'gunicorn --config gunicorn.conf.py src.app:app' instead"
+    )
+    stop_logging()
+    sys.exit(1)
+
 # Initialize database when module is loaded (for gunicorn)
 _initialize_database()
 
@@ -278,19 +945,19 @@ _initialize_database()
 @app.before_request
 def before_request():
     """Execute before each request"""
-    request.start_time = datetime.utcnow()
+    request.start_ns = time.monotonic_ns()
     request.request_id = request.headers.get('X-Request-ID',
-                                             f"{Config.INSTANCE_ID}-{datetime.utcnow().timestamp()}")
+                                             f"{Config.INSTANCE_ID}-{time.time()}")
 
 @app.after_request
 def after_request(response):
     """Execute after each request"""
-    global request_count
-    request_count += 1
+    REQUESTS.inc()
 
     # Calculate request duration
-    if hasattr(request, 'start_time'):
-        duration = (datetime.utcnow() - request.start_time).total_seconds() * 1000
+    duration = 0
+    if hasattr(request, 'start_ns'):
+        duration = (time.monotonic_ns() - request.start_ns) / 1e6
         response.headers['X-Response-Time'] = f"{duration:.2f}ms"
 
     # Add request ID to response
@@ -308,7 +975,7 @@ def after_request(response):
             'method': request.method,
             'path': request.path,
             'status': response.status_code,
-            'duration_ms': duration if hasattr(request, 'start_time') else 0
+            'duration_ms': duration
         }
     )
 
@@ -317,8 +984,7 @@ def after_request(response):
 @app.errorhandler(Exception)
 def handle_exception(e):
     """Global exception handler"""
-    global error_count
-    error_count += 1
+    ERRORS.inc()
 
     # Log the error
     logger.error(
@@ -346,27 +1012,31 @@ def handle_exception(e):
 # Routes
 # =============================================================================
 
+# Everything but the timestamp is fixed for the lifetime of the process, so
+# the body is serialized once and only the timestamp is appended per request
+_INDEX_PREFIX = json_dumps({
+    'status': 'healthy',
+    'service': 'demo-flask-app',
+    'version': Config.APP_VERSION,
+    'environment': Config.ENVIRONMENT,
+    'hostname': socket.gethostname(),
+    'instance_id': Config.INSTANCE_ID,
+    'instance_ip': Config.INSTANCE_IP,
+    'availability_zone': Config.AVAILABILITY_ZONE,
+})[:-1] + b',"timestamp":"'
+
 @app.route('/')
 def index():
     """Root endpoint - basic health check"""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'demo-flask-app',
-        'version': Config.APP_VERSION,
-        'environment': Config.ENVIRONMENT,
-        'hostname': socket.gethostname(),
-        'instance_id': Config.INSTANCE_ID,
-        'instance_ip': Config.INSTANCE_IP,
-        'availability_zone': Config.AVAILABILITY_ZONE,
-        'timestamp': datetime.utcnow().isoformat() + 'Z'
-    })
+    body = b'%s%s"}' % (_INDEX_PREFIX, utc_isoformat().encode())
+    return Response(body, mimetype='application/json')
 
 @app.route('/health')
 def health():
     """Detailed health check endpoint"""
     health_status = {
         'status': 'healthy',
-        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'timestamp': utc_isoformat(),
         'version': Config.APP_VERSION,
         'checks': {
             'application': 'ok',
@@ -379,22 +1049,12 @@ def health():
         }
     }
 
-    # Check database connection (non-blocking)
-    try:
-        if db_pool.pool:
-            conn = db_pool.get_connection()
-            cursor = conn.cursor()
-            cursor.execute('SELECT 1')
-            cursor.fetchone()
-            cursor.close()
-            db_pool.return_connection(conn)
-            health_status['checks']['database'] = 'ok'
-        else:
-            health_status['checks']['database'] = 'not_initialized'
-            # Application is still healthy, just database not connected yet
-    except Exception as e:
-        health_status['checks']['database'] = f'error: {str(e)}'
-        logger.warning(f"Health check database error: {e}")
+    # Database status comes from the background monitor (non-blocking)
+    if db_pool.pool:
+        health_status['checks']['database'] = db_health.status()
+    else:
+        health_status['checks']['database'] = 'not_initialized'
+        # Application is still healthy, just database not connected yet
 
     # Return 200 even if database is not ready (app itself is healthy)
     # Use /db endpoint for strict database health check
@@ -410,26 +1070,21 @@ def db_check():
                 'message': 'Database pool not initialized'
             }), 503
 
-        conn = db_pool.get_connection()
-        cursor = conn.cursor()
-
-        # Get database version
-        cursor.execute('SELECT version()')
-        db_version = cursor.fetchone()[0]
-
-        # Get table count
-        cursor.execute("""
-            SELECT COUNT(*) FROM information_schema.tables
-            WHERE table_schema = 'public'
-        """)
-        table_count = cursor.fetchone()[0]
+        with db_pool.connection() as conn, conn.cursor() as cursor:
+            # Get database version
+            cursor.execute('SELECT version()')
+            db_version = cursor.fetchone()[0]
 
-        # Get items count
-        cursor.execute('SELECT COUNT(*) FROM items')
-        items_count = cursor.fetchone()[0]
+            # Get table count
+            cursor.execute("""
+                SELECT COUNT(*) FROM information_schema.tables
+                WHERE table_schema = 'public'
+            """)
+            table_count = cursor.fetchone()[0]
 
-        cursor.close()
-        db_pool.return_connection(conn)
+            # Get items count
+            cursor.execute('SELECT COUNT(*) FROM items')
+            items_count = cursor.fetchone()[0]
 
         return jsonify({
             'status': 'connected',
@@ -450,40 +1105,43 @@ def db_check():
 def get_items():
     """Get all items from database"""
     try:
-        conn = db_pool.get_connection()
-        cursor = conn.cursor()
-
         # Get query parameters
         limit = request.args.get('limit', 100, type=int)
         offset = request.args.get('offset', 0, type=int)
 
-        cursor.execute("""
-            SELECT id, name, description, value, created_at, updated_at
-            FROM items
-            ORDER BY created_at DESC
-            LIMIT %s OFFSET %s
-        """, (limit, offset))
-
-        items = []
-        for row in cursor.fetchall():
-            items.append({
-                'id': row[0],
-                'name': row[1],
-                'description': row[2],
-                'value': row[3],
-                'created_at': row[4].isoformat() if row[4] else None,
-                'updated_at': row[5].isoformat() if row[5] else None
+        if limit <= STREAM_ITERSIZE:
+            # Small pages fit in one round trip: use the prepared statement and
+            # encode the RealDictRow list with a single orjson call
+            with db_pool.connection() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                    db_pool.execute_prepared(cursor, 'items_list', (limit, offset))
+                    items = cursor.fetchall()
+                conn.commit()
+
+            return jsonify({
+                'items': items,
+                'count': len(items),
+                'limit': limit,
+                'offset': offset
             })
 
-        cursor.close()
-        db_pool.return_connection(conn)
+        with ExitStack() as stack:
+            conn = stack.enter_context(db_pool.connection())
 
-        return jsonify({
-            'items': items,
-            'count': len(items),
-            'limit': limit,
-            'offset': offset
-        })
+            # Named (server-side) cursor keeps the result set in PostgreSQL and
+            # fetches it in STREAM_ITERSIZE chunks while the response is written.
+            # DECLARE cannot wrap EXECUTE, so this path is planned per request.
+            cursor = conn.cursor(name='items_stream', cursor_factory=psycopg2.extras.RealDictCursor)
+            cursor.itersize = STREAM_ITERSIZE
+            cursor.execute("""
+                SELECT id, name, description, value, created_at, updated_at
+                FROM items
+                ORDER BY created_at DESC
+                LIMIT %s OFFSET %s
+            """, (limit, offset))
+
+            # The query succeeded: hand the connection over to the response
+            release = stack.pop_all()
 
     except Exception as e:
         logger.error(f"Failed to get items: {e}")
@@ -492,6 +1150,31 @@ def get_items():
             'message': str(e)
         }), 500
 
+    def generate() -> Iterator[bytes]:
+        """Encode rows one at a time into the JSON response body"""
+        count = 0
+        with release:
+            try:
+                yield b'{"items":['
+                for row in cursor:
+                    if count:
+                        yield b','
+                    yield json_dumps(row)
+                    count += 1
+                yield b'],"count":%d,"limit":%d,"offset":%d}' % (count, limit, offset)
+
+                cursor.close()
+                conn.commit()
+            except Exception as e:
+                # Status and headers are already sent; abort the body
+                logger.error(f"Failed to stream items after {count} rows: {e}")
+                raise
+
+    response = Response(stream_with_context(generate()), mimetype='application/json')
+    # Return the connection even if the client goes away before streaming starts
+    response.call_on_close(release.close)
+    return response
+
 @app.route('/api/items', methods=['POST'])
 def create_item():
     """Create a new item"""
@@ -504,32 +1187,13 @@ def create_item():
                 'message': 'Name is required'
             }), 400
 
-        conn = db_pool.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO items (name, description, value)
-            VALUES (%s, %s, %s)
-            RETURNING id, name, description, value, created_at
-        """, (
+        # Concurrent requests are written together by the insert batcher
+        item = insert_batcher.submit((
             data['name'],
             data.get('description', ''),
             data.get('value', '')
         ))
 
-        row = cursor.fetchone()
-        item = {
-            'id': row[0],
-            'name': row[1],
-            'description': row[2],
-            'value': row[3],
-            'created_at': row[4].isoformat() if row[4] else None
-        }
-
-        conn.commit()
-        cursor.close()
-        db_pool.return_connection(conn)
-
         logger.info(f"Created item: {item['id']}")
 
         return jsonify({
@@ -544,37 +1208,49 @@ def create_item():
             'message': str(e)
         }), 500
 
-@app.route('/metrics')
-def metrics():
-    """Prometheus-style metrics endpoint"""
-    metrics_data = [
-        '# HELP application_info Application information',
-        '# TYPE application_info gauge',
-        f'application_info{{version="{Config.APP_VERSION}",environment="{Config.ENVIRONMENT}",instance="{Config.INSTANCE_ID}"}} 1',
-        '',
-        '# HELP application_up Application is running',
-        '# TYPE application_up gauge',
-        'application_up 1',
-        '',
-        '# HELP http_requests_total Total HTTP requests',
-        '# TYPE http_requests_total counter',
-        f'http_requests_total {request_count}',
-        '',
-        '# HELP http_errors_total Total HTTP errors',
-        '# TYPE http_errors_total counter',
-        f'http_errors_total {error_count}',
-    ]
-
-    # Database connection pool metrics
-    if db_pool.pool:
-        metrics_data.extend([
-            '',
-            '# HELP db_pool_size Database connection pool size',
-            '# TYPE db_pool_size gauge',
-            f'db_pool_size {Config.DB_POOL_MAX_CONN}',
+@app.route('/api/items/bulk', methods=['POST'])
+def create_items_bulk():
+    """Create multiple items in a single statement"""
+    try:
+        data = request.get_json()
+
+        if (not isinstance(data, list) or not data
+                or not all(isinstance(entry, dict) and 'name' in entry for entry in data)):
+            return jsonify({
+                'error': 'Bad Request',
+                'message': 'A non-empty array of items, each with a name, is required'
+            }), 400
+
+        if len(data) > Config.BULK_INSERT_MAX_ITEMS:
+            return jsonify({
+                'error': 'Bad Request',
+                'message': f'At most {Config.BULK_INSERT_MAX_ITEMS} items can be created per request'
+            }), 400
+
+        items = insert_items([
+            (entry['name'], entry.get('description', ''), entry.get('value', ''))
+            for entry in data
         ])
 
-    return Response('\n'.join(metrics_data), mimetype='text/plain')
+        logger.info(f"Created {len(items)} items")
+
+        return jsonify({
+            'message': 'Items created successfully',
+            'items': items,
+            'count': len(items)
+        }), 201
+
+    except Exception as e:
+        logger.error(f"Failed to create items: {e}")
+        return jsonify({
+            'error': 'Failed to create items',
+            'message': str(e)
+        }), 500
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics endpoint"""
+    return Response(generate_latest(REGISTRY), content_type=CONTENT_TYPE_LATEST)
 
 # =============================================================================
 # Application Lifecycle
@@ -600,8 +1276,12 @@ def initialize_app():
 def shutdown_app(signum=None, frame=None):
     """Graceful shutdown"""
     logger.info("Shutting down application...")
+    insert_batcher.stop()
+    db_health.stop()
+    credential_refresher.stop()
     db_pool.close_all()
     logger.info("Application shutdown complete")
+    stop_logging()
     sys.exit(0)
 
 # Register signal handlers for graceful shutdown
@@ -612,6 +1292,9 @@ signal.signal(signal.SIGINT, shutdown_app)
 # Main Entry Point
 # =============================================================================
 
+# Deployments run gunicorn with gunicorn.conf.py, which fans connections out
+# over multiple worker processes; FLASK_ENV is checked before initialization.
+
 if __name__ == '__main__':
     initialize_app()
 
@@ -0,0 +1,158 @@
+"""
+Test fixtures
+=============
+The application module connects to PostgreSQL on import; when no database
+is reachable it keeps running without a pool. Tests swap in an in-memory
+fake pool so they run with or without a database.
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+import psycopg2
+import pytest
+
+from src import app as app_module
+
+
+class FakeDatabase:
+    """In-memory stand-in for the items table"""
+
+    def __init__(self):
+        self.items = []
+        self.insert_calls = []
+        self._lock = threading.Lock()
+
+    def insert(self, rows):
+        """Insert rows atomically, failing the whole statement on a bad row"""
+        with self._lock:
+            self.insert_calls.append(list(rows))
+            if any(name == 'bad' for name, _, _ in rows):
+                raise psycopg2.DataError('invalid input value for column name')
+            created = []
+            for name, description, value in rows:
+                item = {
+                    'id': len(self.items) + 1,
+                    'name': name,
+                    'description': description,
+                    'value': value,
+                    'created_at': datetime(2024, 1, 1) + timedelta(seconds=len(self.items)),
+                }
+                self.items.append(dict(item, updated_at=item['created_at']))
+                created.append(item)
+            return created
+
+    def page(self, limit, offset):
+        """Items newest first, as returned by the items_list query"""
+        with self._lock:
+            return list(reversed(self.items))[offset:offset + limit]
+
+
+class FakeCursor:
+    """Cursor answering the statements the item endpoints issue"""
+
+    def __init__(self, connection, name=None):
+        self.connection = connection
+        self.db = connection.db
+        self.name = name
+        self.itersize = 2000
+        self.executed = []
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        if sql.startswith('EXECUTE items_insert'):
+            self._rows = self.db.insert([params])
+        elif sql.startswith('EXECUTE items_list') or 'LIMIT %s OFFSET %s' in sql:
+            self._rows = self.db.page(*params)
+        else:
+            self._rows = [(1,)]
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeConnection:
+    """Connection handing out FakeCursors"""
+
+    def __init__(self, db):
+        self.db = db
+        self.prepared = set()
+        self.closed = False
+        self.commits = 0
+        self.rollbacks = 0
+        self.cursors = []
+
+    def cursor(self, name=None, cursor_factory=None):
+        cursor = FakeCursor(self, name=name)
+        self.cursors.append(cursor)
+        return cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool:
+    """Minimal ThreadedConnectionPool replacement"""
+
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.Lock()
+        self._pool = []
+        self._used = {}
+
+    def getconn(self):
+        with self._lock:
+            conn = self._pool.pop() if self._pool else FakeConnection(self.db)
+            self._used[id(conn)] = conn
+            return conn
+
+    def putconn(self, conn):
+        with self._lock:
+            del self._used[id(conn)]
+            self._pool.append(conn)
+
+    def closeall(self):
+        pass
+
+
+@pytest.fixture(scope='session')
+def app():
+    """Flask application used by pytest-flask's client fixture"""
+    # Keep the background probe off the fake pool
+    app_module.db_health.stop()
+    app_module.app.config['TESTING'] = True
+    return app_module.app
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Replace the database pool and bulk insert helper with in-memory fakes"""
+    db = FakeDatabase()
+    monkeypatch.setattr(app_module.db_pool, 'pool', FakePool(db))
+    monkeypatch.setattr(
+        app_module, 'execute_values',
+        lambda cursor, sql, rows, template=None, page_size=100, fetch=False: db.insert(rows)
+    )
+    return db
@@ -0,0 +1,331 @@
+"""Tests for the item endpoints and insert batching"""
+
+import threading
+from concurrent.futures import Future
+
+import orjson
+import pytest
+from psycopg2 import pool
+
+from src import app as app_module
+from src.app import DBHealthMonitor, InsertBatcher, REGISTRY, STREAM_ITERSIZE, utc_isoformat
+
+
+def _rows(*names):
+    return [(name, f'{name} description', f'{name} value') for name in names]
+
+
+# =============================================================================
+# Timestamps
+# =============================================================================
+
+def test_utc_isoformat_always_has_microseconds_and_z_suffix():
+    assert utc_isoformat(0) == '1970-01-01T00:00:00.000000Z'
+    assert utc_isoformat(1700000000.25) == '2023-11-14T22:13:20.250000Z'
+
+
+# =============================================================================
+# Connection Pool
+# =============================================================================
+
+def test_checkout_waits_for_a_returned_connection(fake_db, monkeypatch):
+    db_pool = app_module.db_pool
+    monkeypatch.setattr(db_pool, '_slots', threading.Semaphore(1))
+    held = db_pool.get_connection()
+    acquired = []
+
+    waiter = threading.Thread(target=lambda: acquired.append(db_pool.get_connection()))
+    waiter.start()
+    waiter.join(timeout=0.1)
+    assert acquired == []
+
+    db_pool.return_connection(held)
+    waiter.join(timeout=5)
+    assert acquired == [held]
+    db_pool.return_connection(acquired[0])
+
+
+def test_checkout_times_out_when_pool_is_exhausted(fake_db, monkeypatch):
+    db_pool = app_module.db_pool
+    monkeypatch.setattr(db_pool, '_slots', threading.Semaphore(1))
+    monkeypatch.setattr(app_module.Config, 'DB_POOL_ACQUIRE_TIMEOUT', 0.01)
+    held = db_pool.get_connection()
+
+    with pytest.raises(pool.PoolError, match='exhausted'):
+        db_pool.get_connection()
+
+    db_pool.return_connection(held)
+    db_pool.return_connection(db_pool.get_connection())
+
+
+def test_checkout_timeouts_are_counted_apart_from_failures(fake_db, monkeypatch):
+    db_pool = app_module.db_pool
+    monkeypatch.setattr(db_pool, '_slots', threading.Semaphore(0))
+    monkeypatch.setattr(app_module.Config, 'DB_POOL_ACQUIRE_TIMEOUT', 0.01)
+    timeouts = REGISTRY.get_sample_value('db_pool_checkout_timeout_total')
+    failures = REGISTRY.get_sample_value('db_pool_checkout_failed_total')
+
+    with pytest.raises(pool.PoolError):
+        db_pool.get_connection()
+
+    assert REGISTRY.get_sample_value('db_pool_checkout_timeout_total') == timeouts + 1
+    assert REGISTRY.get_sample_value('db_pool_checkout_failed_total') == failures
+
+
+def test_waiting_checkouts_are_sampled(fake_db, monkeypatch):
+    db_pool = app_module.db_pool
+    monkeypatch.setattr(db_pool, '_slots', threading.Semaphore(1))
+    held = db_pool.get_connection()
+    waiter = threading.Thread(target=lambda: db_pool.return_connection(db_pool.get_connection()))
+    waiter.start()
+
+    for _ in range(100):
+        if db_pool.usage()['waiting']:
+            break
+        waiter.join(timeout=0.01)
+    assert REGISTRY.get_sample_value('db_pool_waiting') == 1
+
+    db_pool.return_connection(held)
+    waiter.join(timeout=5)
+    assert REGISTRY.get_sample_value('db_pool_waiting') == 0
+
+
+# =============================================================================
+# Database Health Monitor
+# =============================================================================
+
+def test_health_probe_skips_checkout_metrics(fake_db):
+    before = REGISTRY.get_sample_value('db_pool_checkout_total')
+    monitor = DBHealthMonitor(interval=1, stale_after=10)
+
+    monitor.check()
+
+    assert monitor.status() == 'ok'
+    assert REGISTRY.get_sample_value('db_pool_checkout_total') == before
+
+
+def test_health_probe_reports_exhausted_pool(fake_db, monkeypatch):
+    monkeypatch.setattr(app_module.db_pool, '_slots', threading.Semaphore(0))
+    monkeypatch.setattr(app_module.Config, 'DB_POOL_ACQUIRE_TIMEOUT', 0.01)
+    monitor = DBHealthMonitor(interval=1, stale_after=10)
+
+    monitor.check()
+
+    assert monitor.status() == 'pool_exhausted'
+
+
+# =============================================================================
+# Insert Batcher
+# =============================================================================
+
+def test_batcher_coalesces_queued_rows_into_one_insert(fake_db):
+    batcher = InsertBatcher(max_batch_size=10, max_wait_ms=50)
+    futures = []
+    for row in _rows('a', 'b', 'c'):
+        future = Future()
+        batcher._queue.put((row, future))
+        futures.append(future)
+
+    batcher._ensure_started()
+    try:
+        created = [future.result(timeout=5) for future in futures]
+    finally:
+        batcher.stop()
+
+    assert fake_db.insert_calls == [_rows('a', 'b', 'c')]
+    assert [item['name'] for item in created] == ['a', 'b', 'c']
+
+
+def test_batcher_respects_max_batch_size(fake_db):
+    batcher = InsertBatcher(max_batch_size=2, max_wait_ms=50)
+    futures = []
+    for row in _rows('a', 'b', 'c'):
+        future = Future()
+        batcher._queue.put((row, future))
+        futures.append(future)
+
+    batcher._ensure_started()
+    try:
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        batcher.stop()
+
+    assert [len(call) for call in fake_db.insert_calls] == [2, 1]
+
+
+def test_batcher_isolates_bad_row(fake_db):
+    batch = [(row, Future()) for row in _rows('a', 'bad', 'c')]
+
+    InsertBatcher(max_batch_size=10, max_wait_ms=0)._flush(batch)
+
+    assert batch[0][1].result(timeout=0)['name'] == 'a'
+    assert batch[2][1].result(timeout=0)['name'] == 'c'
+    with pytest.raises(Exception, match='invalid input value'):
+        batch[1][1].result(timeout=0)
+    assert [item['name'] for item in fake_db.items] == ['a', 'c']
+
+
+def test_batcher_fails_whole_batch_on_pool_errors(monkeypatch):
+    calls = []
+
+    def exhausted(rows):
+        calls.append(rows)
+        raise pool.PoolError('connection pool exhausted')
+
+    monkeypatch.setattr(app_module, 'insert_items', exhausted)
+    batch = [(row, Future()) for row in _rows('a', 'b', 'c')]
+
+    InsertBatcher(max_batch_size=10, max_wait_ms=0)._flush(batch)
+
+    assert len(calls) == 1
+    for _, future in batch:
+        with pytest.raises(pool.PoolError):
+            future.result(timeout=0)
+
+
+def test_batcher_skips_rows_cancelled_by_timed_out_requests(fake_db, monkeypatch):
+    batcher = InsertBatcher(max_batch_size=10, max_wait_ms=0)
+    monkeypatch.setattr(batcher, '_ensure_started', lambda: None)
+
+    with pytest.raises(TimeoutError, match='not written'):
+        batcher.submit(_rows('late')[0], timeout=0.01)
+    batch = [batcher._queue.get_nowait(), (_rows('b')[0], Future())]
+
+    batcher._flush(batch)
+
+    assert batch[0][1].cancelled()
+    assert fake_db.insert_calls == [_rows('b')]
+
+
+def test_batcher_fails_futures_without_a_returned_row(monkeypatch):
+    monkeypatch.setattr(app_module, 'insert_items', lambda rows: [{'id': 1, 'name': rows[0][0]}])
+    batch = [(row, Future()) for row in _rows('a', 'b')]
+
+    InsertBatcher(max_batch_size=10, max_wait_ms=0)._flush(batch)
+
+    assert batch[0][1].result(timeout=0) == {'id': 1, 'name': 'a'}
+    with pytest.raises(RuntimeError):
+        batch[1][1].result(timeout=0)
+
+
+def test_create_item(client, fake_db):
+    response = client.post('/api/items', json={'name': 'widget', 'value': '42'})
+
+    assert response.status_code == 201
+    assert response.json['item']['name'] == 'widget'
+    assert fake_db.items[0]['value'] == '42'
+
+
+def test_create_item_requires_name(client, fake_db):
+    response = client.post('/api/items', json={'value': '42'})
+
+    assert response.status_code == 400
+    assert fake_db.insert_calls == []
+
+
+# =============================================================================
+# Bulk Inserts
+# =============================================================================
+
+def test_bulk_insert_uses_one_statement(client, fake_db):
+    payload = [{'name': 'a'}, {'name': 'b', 'description': 'second', 'value': '2'}]
+
+    response = client.post('/api/items/bulk', json=payload)
+
+    assert response.status_code == 201
+    assert response.json['count'] == 2
+    assert fake_db.insert_calls == [[('a', '', ''), ('b', 'second', '2')]]
+
+
+@pytest.mark.parametrize('payload', [
+    {'name': 'not a list'},
+    [],
+    [{'name': 'a'}, {'value': 'no name'}],
+    ['not an object'],
+])
+def test_bulk_insert_rejects_invalid_payload(client, fake_db, payload):
+    response = client.post('/api/items/bulk', json=payload)
+
+    assert response.status_code == 400
+    assert fake_db.insert_calls == []
+
+
+def test_bulk_insert_enforces_item_limit(client, fake_db, monkeypatch):
+    monkeypatch.setattr(app_module.Config, 'BULK_INSERT_MAX_ITEMS', 2)
+
+    response = client.post('/api/items/bulk', json=[{'name': 'a'}, {'name': 'b'}, {'name': 'c'}])
+
+    assert response.status_code == 400
+    assert 'At most 2 items' in response.json['message']
+    assert fake_db.insert_calls == []
+
+
+def test_bulk_insert_reports_database_errors(client, fake_db):
+    response = client.post('/api/items/bulk', json=[{'name': 'a'}, {'name': 'bad'}])
+
+    assert response.status_code == 500
+    assert fake_db.items == []
+
+
+# =============================================================================
+# Item Listing
+# =============================================================================
+
+def test_small_page_uses_prepared_statement(client, fake_db):
+    fake_db.insert(_rows('a', 'b', 'c'))
+
+    response = client.get('/api/items?limit=2&offset=0')
+
+    assert response.status_code == 200
+    assert response.json['count'] == 2
+    assert [item['name'] for item in response.json['items']] == ['c', 'b']
+    conn = app_module.db_pool.pool._pool[0]
+    assert conn.cursors[0].name is None
+    assert [sql.split()[0] for sql, _ in conn.cursors[0].executed] == ['PREPARE', 'EXECUTE']
+    assert conn.cursors[0].executed[1] == ('EXECUTE items_list (%s, %s)', (2, 0))
+
+
+def test_statement_is_prepared_once_per_connection(client, fake_db):
+    client.get('/api/items?limit=2')
+    client.get('/api/items?limit=3')
+
+    conn = app_module.db_pool.pool._pool[0]
+    assert conn.prepared == {'items_list'}
+    assert [sql.split()[0] for sql, _ in conn.cursors[1].executed] == ['EXECUTE']
+
+
+def test_large_page_is_streamed_from_named_cursor(client, fake_db):
+    fake_db.insert(_rows(*(f'item-{i}' for i in range(STREAM_ITERSIZE + 5))))
+    limit = STREAM_ITERSIZE + 1
+
+    response = client.get(f'/api/items?limit={limit}&offset=2')
+    body = orjson.loads(response.get_data())
+
+    assert response.status_code == 200
+    assert body['count'] == limit
+    assert body['limit'] == limit
+    assert body['offset'] == 2
+    assert body['items'][0]['name'] == f'item-{STREAM_ITERSIZE + 2}'
+    conn = app_module.db_pool.pool._pool[0]
+    assert conn.cursors[0].name == 'items_stream'
+    assert conn.cursors[0].itersize == STREAM_ITERSIZE
+
+
+def test_streamed_and_small_pages_encode_items_alike(client, fake_db):
+    fake_db.insert(_rows(*(f'item-{i}' for i in range(STREAM_ITERSIZE + 1))))
+
+    small = orjson.loads(client.get('/api/items?limit=3').get_data())
+    streamed = orjson.loads(client.get(f'/api/items?limit={STREAM_ITERSIZE + 1}').get_data())
+
+    assert streamed['items'][:3] == small['items']
+
+
+def test_streamed_page_returns_connection_to_pool(client, fake_db):
+    fake_db.insert(_rows('a'))
+
+    response = client.get(f'/api/items?limit={STREAM_ITERSIZE + 1}')
+    response.get_data()
+    response.close()
+
+    assert app_module.db_pool.usage() == {'checked_out': 0, 'idle': 1, 'waiting': 0}
@@ -0,0 +1,197 @@
+"""Tests for Secrets Manager credential refresh and pool rotation"""
+
+import json
+import threading
+
+import psycopg2
+import pytest
+
+from src import app as app_module
+from src.app import CredentialRefresher, DatabasePool, DbCreds
+
+
+def _secret(password):
+    return json.dumps({
+        'host': 'db.internal',
+        'port': 5432,
+        'dbname': 'appdb',
+        'username': 'app',
+        'password': password,
+    })
+
+
+class FakeSecretCache:
+    """SecretCache stand-in returning whatever value is currently set"""
+
+    def __init__(self, secret_string):
+        self.secret_string = secret_string
+        self.forced = 0
+
+    def get_secret_string(self, secret_arn):
+        return self.secret_string
+
+    def refresh_secret_now(self, secret_arn):
+        self.forced += 1
+
+
+class FlakyListener:
+    """Listener that raises for its first `failures` calls"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = []
+        self.called = threading.Event()
+
+    def __call__(self, secret_string):
+        self.calls.append(secret_string)
+        self.called.set()
+        if len(self.calls) <= self.failures:
+            raise psycopg2.OperationalError('could not connect to server')
+
+
+def _refresher(secret_string, **kwargs):
+    refresher = CredentialRefresher('arn:secret', refresh_interval=3600, **kwargs)
+    refresher._secret_cache = FakeSecretCache(secret_string)
+    return refresher
+
+
+@pytest.fixture
+def rotation(monkeypatch):
+    """A fresh refresher and pool whose connections are recorded, not opened"""
+    refresher = _refresher(_secret('old'))
+    monkeypatch.setattr(app_module, 'credential_refresher', refresher)
+    monkeypatch.setattr(app_module.Config, 'DB_SECRET_ARN', 'arn:secret')
+
+    db_pool = DatabasePool()
+    db_pool.created = []
+    db_pool.unreachable = False
+
+    def create_pool(creds):
+        if db_pool.unreachable:
+            raise psycopg2.OperationalError('could not connect to server')
+        db_pool.created.append(creds)
+        return object()
+
+    monkeypatch.setattr(db_pool, '_create_pool', create_pool)
+    monkeypatch.setattr(db_pool, '_create_tables', lambda: None)
+    return refresher, db_pool
+
+
+# =============================================================================
+# Credential Refresher
+# =============================================================================
+
+def test_refresh_notifies_listeners_once_per_value():
+    refresher = _refresher(_secret('old'))
+    listener = FlakyListener()
+    refresher.subscribe(listener)
+
+    refresher.refresh()
+    refresher.refresh()
+
+    assert listener.calls == [_secret('old')]
+
+
+def test_forced_refresh_bypasses_the_cache():
+    refresher = _refresher(_secret('old'))
+
+    refresher.refresh(force=True)
+
+    assert refresher._secret_cache.forced == 1
+
+
+def test_failed_apply_is_retried_with_the_same_value():
+    refresher = _refresher(_secret('new'))
+    listener = FlakyListener(failures=1)
+    refresher.subscribe(listener)
+
+    refresher.refresh(force=True)
+    refresher.refresh(force=True)
+    refresher.refresh(force=True)
+
+    assert listener.calls == [_secret('new'), _secret('new')]
+
+
+def test_failed_apply_is_retried_after_retry_interval():
+    refresher = _refresher(_secret('new'), retry_interval=0.01)
+    listener = FlakyListener(failures=1)
+    refresher.subscribe(listener)
+
+    refresher.start()
+    try:
+        refresher.request_refresh()
+        for _ in range(200):
+            if len(listener.calls) >= 2:
+                break
+            listener.called.wait(0.05)
+            listener.called.clear()
+    finally:
+        refresher.stop()
+
+    assert listener.calls[:2] == [_secret('new'), _secret('new')]
+
+
+# =============================================================================
+# Pool Rotation
+# =============================================================================
+
+def test_rotation_rebuilds_pool_with_new_credentials(rotation):
+    refresher, db_pool = rotation
+    db_pool.initialize()
+    stale_pool = db_pool.pool
+
+    refresher._secret_cache.secret_string = _secret('new')
+    refresher.refresh(force=True)
+
+    assert db_pool.pool is not stale_pool
+    assert [creds.password for creds in db_pool.created] == ['old', 'new']
+
+
+def test_failed_rebuild_keeps_old_pool_and_is_retried(rotation):
+    refresher, db_pool = rotation
+    db_pool.initialize()
+    stale_pool = db_pool.pool
+
+    refresher._secret_cache.secret_string = _secret('new')
+    db_pool.unreachable = True
+    refresher.refresh(force=True)
+
+    assert db_pool.pool is stale_pool
+    assert db_pool._cached_creds == DbCreds.from_secret(_secret('old'))
+
+    db_pool.unreachable = False
+    refresher.refresh(force=True)
+
+    assert db_pool.pool is not stale_pool
+    assert db_pool._cached_creds == DbCreds.from_secret(_secret('new'))
+
+
+def test_failed_startup_is_retried_by_refresher(rotation):
+    refresher, db_pool = rotation
+    db_pool.unreachable = True
+    db_pool.initialize()
+    assert db_pool.pool is None
+
+    refresher.refresh(force=True)
+    assert not db_pool._initialized
+
+    db_pool.unreachable = False
+    refresher.refresh(force=True)
+
+    assert db_pool._initialized
+    assert db_pool._cached_creds == DbCreds.from_secret(_secret('old'))
+
+
+def test_login_failure_requests_refresh_and_fails_fast(rotation):
+    refresher, db_pool = rotation
+
+    class RejectingPool:
+        def getconn(self):
+            raise psycopg2.OperationalError('password authentication failed for user "app"')
+
+    db_pool.pool = RejectingPool()
+
+    with pytest.raises(psycopg2.OperationalError):
+        db_pool.get_connection()
+
+    assert refresher._refresh_requested.is_set()